@@ -1,2 +1,3 @@
 from __future__ import annotations
-__all__ = ["cli", "render", "stats", "util", "export", "archiver"]
+from .stats import Circuit, HopStat
+__all__ = ["cli", "render", "stats", "util", "export", "archiver", "Circuit", "HopStat"]
@@ -2,21 +2,25 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import contextlib
 import sys
 import time
-from dataclasses import dataclass, field
+from array import array
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import List, Optional, Tuple
 
-from .render import console, build_table
+from rich.live import Live
+from rich.segment import Segments
+
+from .render import console, build_table, format_alert
+from .stats import Circuit
 from .tracer import resolve_tracer, run_tracer_round
 from .util import (
     ResolvedHost,
     ReverseDNSCache,
     default_log_dir,
     now_local_str,
-    resolve_host,
-    timestamp_filename,
+    resolve_host_cached,
 )
 
 # ---------------- ASCII logo ----------------
@@ -30,54 +34,6 @@ LOGO = r"""
 """.rstrip("\n")
 
 
-# ---------------- Data model ----------------
-
-@dataclass
-class HopStat:
-    ttl: int
-    address: Optional[str]
-    sent: int = 0
-    recv: int = 0
-    best_ms: Optional[float] = None
-    worst_ms: Optional[float] = None
-    avg_ms: Optional[float] = None
-    rtts: List[float] = field(default_factory=list)
-
-    @property
-    def loss_pct(self) -> float:
-        if self.sent == 0:
-            return 0.0
-        return 100.0 * (1 - (self.recv / self.sent))
-
-
-class Circuit:
-    def __init__(self, started_at: float) -> None:
-        self.hops: Dict[int, HopStat] = {}
-        self.started_at = started_at
-        self.filename = timestamp_filename()
-
-    def ensure_hop(self, ttl: int, address: Optional[str]) -> HopStat:
-        hop = self.hops.get(ttl)
-        if not hop:
-            hop = HopStat(ttl=ttl, address=address)
-            self.hops[ttl] = hop
-        if address and not hop.address:
-            hop.address = address
-        return hop
-
-    def update_hop_samples(self, ttl: int, address: Optional[str], samples_ms: List[float]) -> None:
-        hop = self.ensure_hop(ttl, address)
-        sent = max(1, len(samples_ms)) if not samples_ms else len(samples_ms)
-        hop.sent += sent
-        for rtt in samples_ms:
-            hop.recv += 1
-            hop.rtts.append(rtt)
-            hop.best_ms = rtt if hop.best_ms is None else min(hop.best_ms, rtt)
-            hop.worst_ms = rtt if hop.worst_ms is None else max(hop.worst_ms, rtt)
-        if hop.rtts:
-            hop.avg_ms = sum(hop.rtts) / len(hop.rtts)
-
-
 # ---------------- Core loop ----------------
 
 async def mtr_loop(
@@ -92,12 +48,13 @@ async def mtr_loop(
     dns_mode: str = "auto",           # auto|on|off
     max_hops: int = 12,
     ignore_star_hops_for_alerts: bool = True,
+    fps: float = 6.0,                 # max interactive redraws per second; <= 0 => every round
 ) -> Tuple[Circuit, str, List[Tuple[int, str, int, str]]]:
     """
     Run interactive or time-bound monitoring.
     Returns (circuit, display_target, alerts_seen).
     """
-    resolved = resolve_host(target, dns_mode=dns_mode)   # sync
+    resolved = resolve_host_cached(target, dns_mode=dns_mode)   # sync
     display_target = resolved.display
 
     tr_path = resolve_tracer()
@@ -106,74 +63,153 @@ async def mtr_loop(
         sys.exit(2)
 
     started = time.perf_counter()
-    circuit = Circuit(started_at=started)
+    circuit = Circuit(started_at=started, max_hops=max_hops)
     dns_cache = ReverseDNSCache()
 
     alerts: List[Tuple[int, str, int, str]] = []
     last_alert_idx = 0
-    last_reported_lost: Dict[int, int] = {}
+    # Highest lost count already alerted on, indexed by TTL like circuit.hops
+    last_reported_lost = array("i", [0]) * (max_hops + 1)
+
+    # Absolute-deadline pacing: rounds stay on an `interval` grid instead of
+    # drifting by the time each round takes.
+    next_deadline = time.perf_counter()
+
+    # Tracer rounds are produced by a background task so the next traceroute
+    # is already running while the previous round is folded in and rendered.
+    # The small bound keeps a slow consumer from queueing stale rounds.
+    rounds: asyncio.Queue = asyncio.Queue(maxsize=2)
+
+    async def produce_rounds() -> None:
+        try:
+            while True:
+                result = await run_tracer_round(tr_path, resolved.ip, max_hops, timeout, proto, probes)
+                await rounds.put(result)
+                await wait_next_slot()
+        except Exception as exc:
+            # Hand the failure to the consumer instead of dying silently
+            await rounds.put(exc)
 
     async def one_round() -> None:
         nonlocal alerts
-        rtts_by_ttl, addr_by_ttl, _ok = await run_tracer_round(
-            tr_path, resolved.ip, max_hops, timeout, proto, probes
-        )
-
-        # Update stats
+        result = await rounds.get()
+        if isinstance(result, Exception):
+            raise result
+        rtts_by_ttl, addr_by_ttl, _ok = result
+
+        # Update stats (bound methods hoisted out of the per-hop loop)
+        update = circuit.update_hop_samples
+        addr_get = addr_by_ttl.get
+        any_loss = False
         for ttl, samples in rtts_by_ttl.items():
-            addr_raw = addr_by_ttl.get(ttl)
-            circuit.update_hop_samples(ttl, addr_raw, samples)
+            hop = update(ttl, addr_get(ttl), samples)
+            any_loss = any_loss or hop.sent > hop.recv
 
         # Reverse DNS fill-in if requested
         if dns_mode != "off":
-            for ttl, hop in list(circuit.hops.items()):
-                if hop.address and hop.address != "*":
-                    new_name = await dns_cache.lookup(hop.address)
-                    hop.address = new_name or hop.address
-
-        # Generate alerts only when "lost" increases for a hop (and ignore pure "*" hops)
-        for ttl, hop in sorted(circuit.hops.items()):
+            # Always resolve the probed IP (not the shown name) so cached PTRs expire and refresh
+            names = await dns_cache.batch_reverse(hop.ip for _ttl, hop in circuit.items() if hop.ip)
+            for _ttl, hop in circuit.items():
+                if not hop.ip:
+                    continue
+                name = names.get(hop.ip) or hop.ip
+                if name != hop.address:
+                    hop.address = name
+                    circuit.dirty = True
+
+        # Generate alerts only when "lost" increases for a hop (and ignore pure "*" hops).
+        # Only hops sampled this round can have new losses; traceroute lists them in TTL order.
+        if not any_loss:
+            return
+        if len(last_reported_lost) < len(circuit.hops):
+            last_reported_lost.extend([0] * (len(circuit.hops) - len(last_reported_lost)))
+        ts: Optional[str] = None  # one timestamp shared by every alert this round
+        hops = circuit.hops
+        for ttl in rtts_by_ttl:
+            hop = hops[ttl]
             if ignore_star_hops_for_alerts and (hop.address in (None, "*")):
                 continue
             current_lost = hop.sent - hop.recv
             if current_lost <= 0:
                 continue
-            if current_lost > last_reported_lost.get(ttl, 0):
+            if current_lost > last_reported_lost[ttl]:
                 last_reported_lost[ttl] = current_lost
-                alerts.append((ttl, hop.address or "*", current_lost, now_local_str()))
-
-    def print_frame() -> None:
-        console.clear()
-        # Top: logo
-        console.print(LOGO)
-        # Table
-        table = build_table(circuit, display_target, circuit.started_at, ascii_mode=ascii_mode, wide=False)
-        console.print(table)
-        # Alerts below the summary
-        if last_alert_idx < len(alerts):
-            for ttl, addr, lost, ts in alerts[last_alert_idx:]:
-                console.print(f"❌ Packet loss detected on hop {ttl} ({addr}) at {ts} - {lost} packets lost")
+                if ts is None:
+                    ts = now_local_str()
+                alerts.append((ttl, hop.address or "*", current_lost, ts))
+                circuit.dirty = True
+
+    async def wait_next_slot() -> None:
+        nonlocal next_deadline
+        next_deadline += interval
+        now = time.perf_counter()
+        if next_deadline < now - interval:
+            # Round overran by more than a full interval; re-anchor rather than
+            # firing a burst of catch-up rounds.
+            next_deadline = now
+        delay = next_deadline - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            # Already late (or interval=0): just yield to the loop
+            await asyncio.sleep(0)
+
+    def make_table():
+        return build_table(circuit, display_target, circuit.started_at, ascii_mode=ascii_mode, wide=False)
+
+    def render_frame() -> Segments:
+        # Rich's layout/render is the expensive part of a frame; doing it here means
+        # Live only has to replay the finished segments when it repaints
+        lines = console.render_lines(make_table(), console.options, pad=False, new_lines=True)
+        return Segments([seg for line in lines for seg in line])
+
+    def show_frame(live: Live, frame) -> None:
+        nonlocal last_alert_idx
+        # New alerts are printed once, above the live region, so they stay in scrollback
+        for alert in alerts[last_alert_idx:]:
+            live.console.print(format_alert(alert))
+        last_alert_idx = len(alerts)
+        # Live repaints just the table in place instead of clearing the screen
+        live.update(frame, refresh=True)
 
     # Run
-    if duration <= 0:
-        try:
-            while True:
-                await one_round()
-                print_frame()
-                last_alert_idx = len(alerts)
-                await asyncio.sleep(interval)
-        except (asyncio.CancelledError, KeyboardInterrupt):
-            print_frame()
+    producer = asyncio.ensure_future(produce_rounds())
+    try:
+        if duration <= 0:
+            render_dt = 1.0 / fps if fps > 0 else 0.0
+            last_render = float("-inf")
+            console.clear()
+            # The logo is static, so it is printed once and scrolls away like any output;
+            # "visible" lets a table taller than the terminal grow instead of being cut off
+            console.print(LOGO)
+            with Live(console=console, auto_refresh=False, vertical_overflow="visible") as live:
+                try:
+                    while True:
+                        await one_round()
+                        # Idle rounds (nothing parsed) leave the previous frame up, and
+                        # rounds faster than the redraw rate fold into the next frame
+                        now = time.perf_counter()
+                        if circuit.dirty and now - last_render >= render_dt:
+                            circuit.dirty = False
+                            last_render = now
+                            # Lay out and render the table off the event loop; it does no asyncio I/O
+                            frame = await asyncio.to_thread(render_frame)
+                            show_frame(live, frame)
+                except (asyncio.CancelledError, KeyboardInterrupt):
+                    show_frame(live, render_frame())
+                    return circuit, display_target, alerts
+        else:
+            try:
+                deadline = time.perf_counter() + duration
+                while time.perf_counter() < deadline:
+                    await one_round()
+            except (asyncio.CancelledError, KeyboardInterrupt):
+                pass
             return circuit, display_target, alerts
-    else:
-        try:
-            deadline = time.perf_counter() + duration
-            while time.perf_counter() < deadline:
-                await one_round()
-                await asyncio.sleep(interval)
-        except (asyncio.CancelledError, KeyboardInterrupt):
-            pass
-        return circuit, display_target, alerts
+    finally:
+        producer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await producer
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
@@ -186,33 +222,28 @@ def build_arg_parser() -> argparse.ArgumentParser:
     p.add_argument("--duration", type=int, default=0, help="Seconds to run; 0 = interactive continuous")
     p.add_argument("--dns", choices=["auto", "on", "off"], default="auto", help="Reverse DNS policy")
     p.add_argument("--ascii", action="store_true", help="Use ASCII borders in TUI")
+    p.add_argument("--fps", type=float, default=6.0, help="Max TUI redraws per second (0 = every round)")
     p.add_argument("--export", action="store_true", help="Write a text log at the end (non-interactive mode)")
     p.add_argument("--outfile", default="auto", help="'auto' = timestamp in ~/mtr/logs, or explicit path")
     p.add_argument("--max-hops", type=int, default=12, help="Max hops to probe (passed to traceroute)")
     return p
 
 
-def main(argv: Optional[List[str]] = None) -> int:
+async def run(args: argparse.Namespace) -> int:
     from .export import write_text_report
 
-    args = build_arg_parser().parse_args(argv)
-
-    try:
-        circuit, display_target, alerts = asyncio.run(
-            mtr_loop(
-                args.target,
-                proto=args.proto,
-                interval=args.interval,
-                probes=args.probes,
-                timeout=args.timeout,
-                duration=args.duration,
-                ascii_mode=args.ascii,
-                dns_mode=args.dns,
-                max_hops=args.max_hops,
-            )
-        )
-    except KeyboardInterrupt:
-        return 0
+    circuit, display_target, alerts = await mtr_loop(
+        args.target,
+        proto=args.proto,
+        interval=args.interval,
+        probes=args.probes,
+        timeout=args.timeout,
+        duration=args.duration,
+        ascii_mode=args.ascii,
+        dns_mode=args.dns,
+        max_hops=args.max_hops,
+        fps=args.fps,
+    )
 
     # Interactive run doesn’t export
     if args.duration <= 0:
@@ -221,10 +252,20 @@ def main(argv: Optional[List[str]] = None) -> int:
     outdir = default_log_dir()
     if args.outfile != "auto":
         outdir = Path(args.outfile).expanduser().resolve().parent
-    path = write_text_report(circuit, display_target, alerts, outdir, ascii_mode=args.ascii)
+    # Render + disk write in a worker thread so loop teardown isn't serialized behind it
+    path = await asyncio.to_thread(write_text_report, circuit, display_target, alerts, outdir)
     console.print(f"[green]Saved:[/green] {path}")
     return 0
 
 
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 0
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
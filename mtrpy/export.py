@@ -1,10 +1,21 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
-from .render import render_table
-from .util import atomic_write_text, ensure_dir
+from .render import format_alert, render_text
+from .util import atomic_write_chunks, ensure_dir
+
+
+def _report_chunks(table_text: str, alerts: List[Tuple[int, str, int, str]]) -> Iterator[bytes]:
+    """Encoded report pieces, produced lazily so the file is streamed rather than joined."""
+    yield table_text.encode("utf-8")
+    yield b"\n\nAlerts:"
+    if alerts:
+        for alert in alerts:
+            yield b"\n" + format_alert(alert).encode("utf-8")
+    else:
+        yield b"\nNone"
 
 
 def write_text_report(
@@ -12,21 +23,12 @@ def write_text_report(
     target_display: str,
     alerts: List[Tuple[int, str, int, str]],  # (ttl, addr_display, lost_count, time_str)
     outdir: Path,
-    ascii_mode: bool = False,
 ) -> Path:
+    """Write the final table plus alerts to outdir; the table is plain aligned text, without borders."""
     ensure_dir(outdir)
-    # table as text
-    table_text = render_table(circuit, target_display, circuit.started_at, ascii_mode=ascii_mode, wide=False)
-
-    lines = [table_text, ""]
-    lines.append("Alerts:")
-    if alerts:
-        for ttl, addr_disp, lost, ts in alerts:
-            lines.append(f"❌ Packet loss detected on hop {ttl} ({addr_disp}) at {ts} - {lost} packets lost")
-    else:
-        lines.append("None")
+    # table as plain text: a log file has no use for Rich layout or ANSI styling
+    table_text = render_text(circuit, target_display, circuit.started_at)
 
-    content = "\n".join(lines)
     out_path = outdir / circuit.filename
-    atomic_write_text(out_path, content)
+    atomic_write_chunks(out_path, _report_chunks(table_text, alerts))
     return out_path
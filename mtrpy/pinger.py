@@ -18,27 +18,20 @@ async def ping_host(address: str, count: int = 1, deadline: float = 1.0) -> Ping
     Send ICMP echo requests using icmplib.
     Returns a PingStat with loss percentage and latency stats.
     """
+    received = 0
+    avg_ms = best_ms = worst_ms = None
     try:
         host = await async_ping(address, count=count, interval=0.2, timeout=deadline, privileged=False)
-        transmitted = count
         received = host.packets_received
-        loss_pct = 100.0 * (1 - (received / transmitted if transmitted else 0))
-        return PingStat(
-            address=address,
-            transmitted=transmitted,
-            received=received,
-            loss_pct=loss_pct,
-            avg_ms=host.avg_rtt,
-            best_ms=host.min_rtt,
-            worst_ms=host.max_rtt,
-        )
+        avg_ms, best_ms, worst_ms = host.avg_rtt, host.min_rtt, host.max_rtt
     except Exception:
-        return PingStat(
-            address=address,
-            transmitted=count,
-            received=0,
-            loss_pct=100.0,
-            avg_ms=None,
-            best_ms=None,
-            worst_ms=None,
-        )
+        pass  # unreachable/unresolvable: report total loss
+    return PingStat(
+        address=address,
+        transmitted=count,
+        received=received,
+        loss_pct=100.0 * (count - received) / count if count else 100.0,
+        avg_ms=avg_ms,
+        best_ms=best_ms,
+        worst_ms=worst_ms,
+    )
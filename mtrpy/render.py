@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from operator import attrgetter
 from time import perf_counter
-from typing import Optional
+from typing import Tuple
 
 from rich.console import Console
 from rich.table import Table
@@ -11,9 +12,46 @@ console = Console(color_system="standard", force_terminal=True)
 
 HEADERS = ["Hop", "Address", "Loss%", "Snt", "Recv", "Avg", "Best", "Wrst"]
 
+# (header, justify, no_wrap) per column, computed once instead of per table
+_COLUMNS = tuple(
+    (h, "left" if h == "Address" else "right", h != "Address") for h in HEADERS
+)
 
-def _fmt_ms(v: Optional[float]) -> str:
-    return f"{v:.1f}" if v is not None else "-"
+
+# str() of small non-negative ints (TTLs, loss %, typical counts) looked up instead of formatted
+_SMALL_INT_STR = tuple(map(str, range(1024)))
+
+
+def _int_str(n: int) -> str:
+    return _SMALL_INT_STR[n] if 0 <= n < 1024 else str(n)
+
+
+ALERT_FMT = "❌ Packet loss detected on hop %d (%s) at %s - %d packets lost"
+
+
+def format_alert(alert: Tuple[int, str, int, str]) -> str:
+    """Format an alert tuple (ttl, addr_display, lost_count, time_str)."""
+    ttl, addr, lost, ts = alert
+    return ALERT_FMT % (ttl, addr, ts, lost)
+
+
+# Fetches every HopStat field a row needs in one C-level call
+_hop_fields = attrgetter("address", "loss_pct", "sent", "recv", "avg_ms", "best_ms", "worst_ms")
+
+
+def _row_cells(ttl: int, hop) -> Tuple[str, ...]:
+    """Formatted cells for one hop, in HEADERS order."""
+    address, loss_pct, sent, recv, avg, best, worst = _hop_fields(hop)
+    return (
+        _int_str(ttl),
+        address or "*",
+        _int_str(round(loss_pct)),
+        _int_str(sent),
+        _int_str(recv),
+        "-" if avg is None else format(avg, ".1f"),
+        "-" if best is None else format(best, ".1f"),
+        "-" if worst is None else format(worst, ".1f"),
+    )
 
 
 def build_table(
@@ -35,39 +73,25 @@ def build_table(
         collapse_padding=True,
     )
 
-    for h in HEADERS:
-        justify = "left" if h == "Address" else "right"
-        t.add_column(h, justify=justify, no_wrap=(h != "Address"))
-
-    for ttl in sorted(circuit.hops.keys()):
-        hop = circuit.hops[ttl]
-        address = hop.address or "*"
-        sent = hop.sent
-        recv = hop.recv
-        loss_pct = 0.0 if sent == 0 else (100.0 * (1.0 - (recv / sent)))
-
-        t.add_row(
-            f"{ttl}",
-            address,
-            f"{int(round(loss_pct))}",
-            f"{sent}",
-            f"{recv}",
-            _fmt_ms(hop.avg_ms),
-            _fmt_ms(hop.best_ms),
-            _fmt_ms(hop.worst_ms),
-        )
+    for h, justify, no_wrap in _COLUMNS:
+        t.add_column(h, justify=justify, no_wrap=no_wrap)
+
+    for ttl, hop in circuit.items():
+        t.add_row(*_row_cells(ttl, hop))
     return t
 
 
-def render_table(
-    circuit,
-    target: str,
-    started_at: float,
-    *,
-    ascii_mode: bool = False,
-    wide: bool = False,
-) -> str:
-    table = build_table(circuit, target, started_at, ascii_mode=ascii_mode, wide=wide)
-    with console.capture() as cap:
-        console.print(table)
-    return cap.get()
+def render_text(circuit, target: str, started_at: float) -> str:
+    """Plain-text table (no Rich layout, no ANSI codes) with the same columns as build_table."""
+    rows = [HEADERS, *(_row_cells(ttl, hop) for ttl, hop in circuit.items())]
+    widths = [max(map(len, col)) for col in zip(*rows)]
+    lines = [f"mtr-logger → {target}"]
+    for row in rows:
+        cells = [
+            cell.ljust(w) if justify == "left" else cell.rjust(w)
+            for cell, w, (_h, justify, _nw) in zip(row, widths, _COLUMNS)
+        ]
+        lines.append("  ".join(cells).rstrip())
+    lines.append(f"{int(perf_counter() - started_at)}s")
+    return "\n".join(lines) + "\n"
+
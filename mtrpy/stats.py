@@ -1,8 +1,15 @@
 from __future__ import annotations
+import sys
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List
+from operator import attrgetter
+from typing import Iterator, List, Optional, Tuple
 
-@dataclass
+from .util import timestamp_filename
+
+# __slots__ instead of a per-instance __dict__ (dataclass slots= needs 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class HopStat:
     ttl: int
     address: Optional[str]
@@ -11,71 +18,78 @@ class HopStat:
     best_ms: Optional[float] = None
     worst_ms: Optional[float] = None
     avg_ms: Optional[float] = None
-    rtts: List[float] = field(default_factory=list)
+    ip: Optional[str] = None  # probed address; `address` is what gets displayed (may become a PTR name)
+    # Derived state, maintained only by Circuit.update_hop_round
+    _sum: float = field(default=0.0, init=False, repr=False)  # running total of received RTTs, for avg_ms
+    loss_pct: float = field(default=0.0, init=False)  # refreshed on every update, not per render
 
-    @property
-    def loss_pct(self) -> float:
-        if self.sent == 0:
-            return 0.0
-        return 100.0 * (1.0 - (self.recv / self.sent))
+_row_fields = attrgetter("ttl", "address", "loss_pct", "sent", "recv", "avg_ms", "best_ms", "worst_ms")
 
 class Circuit:
     """
     Holds cumulative hop stats across tracer rounds.
     """
 
-    def __init__(self) -> None:
-        self.hops: Dict[int, HopStat] = {}
+    def __init__(self, started_at: float, max_hops: int = 30) -> None:
+        # Dense slots indexed directly by TTL (slot 0 is never used)
+        self.hops: List[Optional[HopStat]] = [None] * (max_hops + 1)
+        self.started_at = started_at
+        self.filename = timestamp_filename()
+        # Set whenever visible hop state changes; cleared by the renderer
+        self.dirty = True
 
-    def _get(self, ttl: int, address: Optional[str]) -> HopStat:
-        hop = self.hops.get(ttl)
-        if not hop:
-            hop = HopStat(ttl=ttl, address=address)
-            self.hops[ttl] = hop
+    def ensure_hop(self, ttl: int, address: Optional[str]) -> HopStat:
+        if ttl >= len(self.hops):
+            self.hops.extend([None] * (ttl + 1 - len(self.hops)))
+        hop = self.hops[ttl]
+        if hop is None:
+            hop = self.hops[ttl] = HopStat(ttl=ttl, address=address, ip=address)
         # prefer to remember an address once we see it
-        if address and not hop.address:
-            hop.address = address
+        elif address and not hop.ip:
+            hop.ip = hop.address = address
         return hop
 
-    def update_hop_round(self, ttl: int, address: Optional[str], probes_attempted: int, samples_ms: List[float]) -> None:
+    def update_hop_round(self, ttl: int, address: Optional[str], probes_attempted: int, samples_ms: List[float]) -> HopStat:
         """
         Increment 'sent' by the number of probes attempted this round, even if zero replies,
         then fold in any RTT samples we did receive.
         """
-        hop = self._get(ttl, address)
+        hop = self.ensure_hop(ttl, address)
         if probes_attempted < 0:
             probes_attempted = 0
         hop.sent += probes_attempted
 
-        for rtt in samples_ms:
-            hop.recv += 1
-            hop.rtts.append(rtt)
-            hop.best_ms = rtt if hop.best_ms is None else min(hop.best_ms, rtt)
-            hop.worst_ms = rtt if hop.worst_ms is None else max(hop.worst_ms, rtt)
-
-        if hop.rtts:
-            # simple running average from stored samples
-            hop.avg_ms = sum(hop.rtts) / len(hop.rtts)
+        if samples_ms:
+            # Fold the round into running scalars; no per-sample history is kept
+            best, worst = min(samples_ms), max(samples_ms)
+            if hop.best_ms is None or best < hop.best_ms:
+                hop.best_ms = best
+            if hop.worst_ms is None or worst > hop.worst_ms:
+                hop.worst_ms = worst
+            hop.recv += len(samples_ms)
+            hop._sum += sum(samples_ms)
+            hop.avg_ms = hop._sum / hop.recv
+        if hop.sent:
+            hop.loss_pct = 100.0 * (1.0 - (hop.recv / hop.sent))
+        self.dirty = True
+        return hop
 
-    # Backwards-compat helpers (used nowhere after this fix, but harmless to keep)
-    def update_hop(self, ttl: int, address: Optional[str], rtt_ms: Optional[float]) -> None:
-        self.update_hop_round(ttl, address, 1, [] if rtt_ms is None else [rtt_ms])
+    def update_hop(self, ttl: int, address: Optional[str], rtt_ms: Optional[float]) -> HopStat:
+        return self.update_hop_round(ttl, address, 1, [] if rtt_ms is None else [rtt_ms])
 
-    def update_hop_samples(self, ttl: int, address: Optional[str], samples_ms: List[float]) -> None:
-        self.update_hop_round(ttl, address, max(1, len(samples_ms)), samples_ms)
+    def update_hop_samples(self, ttl: int, address: Optional[str], samples_ms: List[float]) -> HopStat:
+        """One round of traceroute output for a hop; an all-star row counts as one lost probe."""
+        return self.update_hop_round(ttl, address, max(1, len(samples_ms)), samples_ms)
 
     # Rendering helpers
+    def items(self) -> Iterator[Tuple[int, HopStat]]:
+        """Yield (ttl, hop) for every seen hop, in TTL order."""
+        for ttl, hop in enumerate(self.hops):
+            if hop is not None:
+                yield ttl, hop
+
     def rows(self):
         """Yield rows in TTL order."""
-        for ttl in sorted(self.hops.keys()):
-            hop = self.hops[ttl]
-            yield (
-                hop.ttl,
-                hop.address or "*",
-                int(round(hop.loss_pct)),
-                hop.sent,
-                hop.recv,
-                hop.avg_ms,
-                hop.best_ms,
-                hop.worst_ms,
-            )
+        for _ttl, hop in self.items():
+            ttl, address, loss_pct, sent, recv, avg_ms, best_ms, worst_ms = _row_fields(hop)
+            yield (ttl, address or "*", int(round(loss_pct)), sent, recv, avg_ms, best_ms, worst_ms)
@@ -2,46 +2,79 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
-import re
+import functools
+import os
+import sys
 from typing import Dict, List, Optional, Tuple
 
-from .util import which
+from .util import HAS_ASYNC_TIMEOUT, which
 
-# Matches lines like:
-# " 1  something ..."
-_TR_PAT = re.compile(r"^\s*(\d+)\s+(.+)$")
+# google-re2 is a linear-time DFA engine with the same compile/findall API, but
+# its per-call overhead makes it ~10x slower than re on short hop lines, so
+# it is opt-in: set MTRPY_RE2=1 (and install the 're2' extra).
+USE_RE2 = os.getenv("MTRPY_RE2", "") not in ("", "0")
+if USE_RE2:
+    try:
+        import re2 as re
+    except ImportError:
+        import re
+else:
+    import re
 
-# Extracts RTT samples like "11.1 ms" → 11.1
-_RTTS_PAT = re.compile(r"([0-9]+\.[0-9]+)\s*ms")
+# Patterns run on the raw (undecoded) traceroute bytes.
+
+# Maps "(" and ")" to spaces so "host (1.2.3.4)" tokenizes in one pass
+_PARENS_TO_SPACE = bytes.maketrans(b"()", b"  ")
 
-# Very loose IPv4/IPv6 "looks like an address" check (good enough for tracer output)
-def _looks_like_ip(token: str) -> bool:
-    if token.count(".") == 3:
-        return True
-    if ":" in token:  # IPv6
-        return True
-    return False
+# Extracts RTT samples like "11.1 ms" → 11.1
+_RTTS_PAT = re.compile(rb"([0-9]+\.[0-9]+)\s*ms")
+_find_rtts = _RTTS_PAT.findall  # bound once; called for every hop line
+
+
+def _parse_hop_line(line: bytes) -> Optional[Tuple[int, Optional[str], List[float]]]:
+    """Parse one traceroute output line into (ttl, addr, samples), or None if it is not a hop line."""
+    # Hop lines look like " 1  something ..."; header and blank lines never start
+    # with a digit, so reject them on the first byte before splitting anything
+    line = line.lstrip()
+    if not line[:1].isdigit():
+        return None
+    head, _, rest = line.partition(b" ")
+    if not head.isdigit():
+        return None
+    rest = rest.strip()
+    if not rest:
+        return None
+
+    ttl = int(head)
+
+    # All-star row like "* * *"
+    if rest.startswith(b"*"):
+        return ttl, None, []
+
+    # Extract an address to store. Prefer the last IP-looking token in the row,
+    # so scan from the right and stop at the first hit.
+    addr_ip: Optional[bytes] = None
+    for token in reversed(rest.translate(_PARENS_TO_SPACE).split()):
+        # Very loose IPv6 / dotted-quad IPv4 check (good enough for tracer output)
+        if b":" in token or (token.count(b".") == 3 and token[:1].isdigit()):
+            addr_ip = token
+            break
+    # Only the address ever needs to become text; intern it so the same hop
+    # shares one string object across rounds and dict lookups compare by identity
+    addr = sys.intern(addr_ip.decode("ascii", "replace")) if addr_ip is not None else None
+
+    # Collect RTT samples
+    return ttl, addr, list(map(float, _find_rtts(rest)))
 
 
 def resolve_tracer() -> Optional[str]:
+    """Locate traceroute on PATH (which() caches the answer per PATH value)."""
     return which(["traceroute"])
 
 
-async def run_tracer_round(
-    tr_path: str,
-    ip: str,
-    max_hops: int,
-    timeout: float,
-    proto: str,
-    probes: int,
-) -> Tuple[Dict[int, List[float]], Dict[int, Optional[str]], bool]:
-    """
-    Launch system traceroute for a single round and parse per-TTL RTT samples.
-    Returns (rtts_by_ttl, addr_by_ttl, ok).
-    - rtts_by_ttl[ttl] = [rtt_ms, ...]
-    - addr_by_ttl[ttl] = "ip" or None (when "*")
-    - ok: True if we parsed something; False if the run clearly failed
-    """
+@functools.lru_cache(maxsize=32)
+def _build_cmd_prefix(tr_path: str, max_hops: int, timeout: float, proto: str, probes: int) -> Tuple[str, ...]:
+    """traceroute argv up to (not including) the target; identical for every round of a session."""
     # Map proto → traceroute flags
     if proto == "icmp":
         proto_flag = "-I"
@@ -58,63 +91,68 @@ async def run_tracer_round(
         "-q", str(probes),
         "-w", str(timeout),
         "-m", str(max_hops),
-        ip,
     ]
-    args = [a for a in args if a]  # drop empty strings
+    return tuple(a for a in args if a)  # drop empty strings
+
+
+async def run_tracer_round(
+    tr_path: str,
+    ip: str,
+    max_hops: int,
+    timeout: float,
+    proto: str,
+    probes: int,
+) -> Tuple[Dict[int, List[float]], Dict[int, Optional[str]], bool]:
+    """
+    Launch system traceroute for a single round and parse per-TTL RTT samples.
+    Returns (rtts_by_ttl, addr_by_ttl, ok).
+    - rtts_by_ttl[ttl] = [rtt_ms, ...]
+    - addr_by_ttl[ttl] = "ip" or None (when "*")
+    - ok: True if we parsed something; False if the run clearly failed
+    """
+    args = [*_build_cmd_prefix(tr_path, max_hops, timeout, proto, probes), ip]
 
     proc = await asyncio.create_subprocess_exec(
-        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
     )
 
     # Give the round a sane upper bound: per-probe timeout × probes × hops, with a little cushion
     # This keeps the round responsive and cancellable.
     round_budget = max(1.0, timeout * max(1, probes) * max(1, max_hops) * 1.2)
 
+    rtts_by_ttl: Dict[int, List[float]] = {}
+    addr_by_ttl: Dict[int, Optional[str]] = {}
+    ok = False  # flip True if we parse at least one TTL line
+
+    async def drain() -> None:
+        # Parse hop lines as traceroute prints them rather than buffering the whole run
+        nonlocal ok
+        async for line in proc.stdout:
+            hop = _parse_hop_line(line)
+            if hop is None:
+                continue
+            ok = True  # saw at least one hop line
+            ttl, addr, samples = hop
+            addr_by_ttl[ttl] = addr
+            rtts_by_ttl[ttl] = samples
+        await proc.wait()
+
+    # One deadline for the whole round, not a wait_for per line
     try:
-        out_b, err_b = await asyncio.wait_for(proc.communicate(), timeout=round_budget)
+        if HAS_ASYNC_TIMEOUT:
+            async with asyncio.timeout(round_budget):
+                await drain()
+        else:
+            await asyncio.wait_for(drain(), timeout=round_budget)
     except asyncio.TimeoutError:
-        # If the round runs too long, kill and treat as a soft failure
+        # If the round runs too long, kill and keep whatever hops already arrived
         with contextlib.suppress(ProcessLookupError):
             proc.kill()
-        out_b, err_b = b"", b""
+        await proc.wait()
     except asyncio.CancelledError:
         # If user hits Ctrl+C while we're waiting, kill the tracer and bubble up
         with contextlib.suppress(ProcessLookupError):
             proc.kill()
         raise
 
-    text = out_b.decode("utf-8", "replace").splitlines()
-
-    rtts_by_ttl: Dict[int, List[float]] = {}
-    addr_by_ttl: Dict[int, Optional[str]] = {}
-    ok = False  # flip True if we parse at least one TTL line
-
-    for line in text:
-        m = _TR_PAT.match(line)
-        if not m:
-            continue
-
-        ok = True  # saw at least one hop line
-
-        ttl = int(m.group(1))
-        rest = m.group(2).strip()
-
-        # All-star row like "* * *"
-        if rest.startswith("*"):
-            addr_by_ttl[ttl] = None
-            rtts_by_ttl.setdefault(ttl, [])
-            continue
-
-        # Extract an address to store. Prefer the last IP-looking token in the row.
-        addr_ip: Optional[str] = None
-        # Normalize parentheses so "host (1.2.3.4)" becomes tokens we can scan
-        for token in rest.replace("(", " ").replace(")", " ").split():
-            if _looks_like_ip(token):
-                addr_ip = token
-        addr_by_ttl[ttl] = addr_ip
-
-        # Collect RTT samples
-        samples = [float(x) for x in _RTTS_PAT.findall(rest)]
-        rtts_by_ttl[ttl] = samples
-
     return rtts_by_ttl, addr_by_ttl, ok
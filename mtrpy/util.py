@@ -2,17 +2,28 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import functools
 import os
+import re
 import socket
 import sys
 import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from pathlib import Path
 from shutil import which as _which
 from typing import Iterable, Optional
 
-IS_WINDOWS = sys.platform.startswith("win")
+try:  # optional: c-ares stub resolver, answers PTR queries on the event loop itself
+    import aiodns
+except ImportError:
+    aiodns = None
+
+IS_WINDOWS = os.name == "nt"
+# asyncio.timeout() (3.11+) bounds an await without wrapping it in a new Task
+HAS_ASYNC_TIMEOUT = sys.version_info >= (3, 11)
 
 
 # ---------------- Filesystem helpers ----------------
@@ -21,7 +32,9 @@ def ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
+@functools.lru_cache(maxsize=1)
 def default_log_dir() -> Path:
+    """~/mtr/logs, created on first call; later calls reuse the cached Path."""
     base = Path.home() / "mtr" / "logs"
     ensure_dir(base)
     return base
@@ -29,17 +42,29 @@ def default_log_dir() -> Path:
 
 def timestamp_filename(prefix: str = "mtr", ext: str = ".txt") -> str:
     # mtr-09-24-2025-01-51-57.txt
-    ts = datetime.now().strftime("%m-%d-%Y-%H-%M-%S")
+    ts = time.strftime("%m-%d-%Y-%H-%M-%S")
     return f"{prefix}-{ts}{ext}"
 
 
 def atomic_write_text(path: Path, text: str) -> None:
     """Safely write text by using a temporary file and atomic rename."""
+    atomic_write_chunks(path, (text.encode("utf-8"),))
+
+
+def atomic_write_chunks(path: Path, chunks: Iterable[bytes]) -> None:
+    """Like atomic_write_text, but streams encoded `chunks` through a 64 KiB write buffer."""
     ensure_dir(path.parent)
-    with tempfile.NamedTemporaryFile("w", delete=False, dir=str(path.parent)) as tmp:
-        tmp.write(text)
-        tmp_path = Path(tmp.name)
-    tmp_path.replace(path)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent))
+    try:
+        with open(fd, "wb", buffering=1 << 16) as f:
+            f.writelines(chunks)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
 
 
 # ---------------- Time helpers ----------------
@@ -50,11 +75,11 @@ def now_local_str(time_only: bool = False) -> str:
       - time_only=True: '1:02:11PM'
       - else: '09-24-2025 1:02:11PM'
     """
-    now = datetime.now()
+    now = time.localtime()
+    clock = time.strftime("%I:%M:%S%p", now).lstrip("0")
     if time_only:
-        s = now.strftime("%I:%M:%S%p")
-        return s.lstrip("0")
-    return f"{now.strftime('%m-%d-%Y')} {now.strftime('%I:%M:%S%p').lstrip('0')}"
+        return clock
+    return f"{time.strftime('%m-%d-%Y', now)} {clock}"
 
 
 # ---------------- Process / system helpers ----------------
@@ -65,7 +90,11 @@ async def run_proc(*args: str, timeout: Optional[float] = None) -> tuple[bytes,
         *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
     )
     try:
-        out_b, err_b = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        if HAS_ASYNC_TIMEOUT:
+            async with asyncio.timeout(timeout):
+                out_b, err_b = await proc.communicate()
+        else:
+            out_b, err_b = await asyncio.wait_for(proc.communicate(), timeout=timeout)
     except asyncio.TimeoutError:
         with contextlib.suppress(ProcessLookupError):
             proc.kill()
@@ -73,19 +102,33 @@ async def run_proc(*args: str, timeout: Optional[float] = None) -> tuple[bytes,
     return out_b, err_b, proc.returncode
 
 
-def which(candidates: Iterable[str] | str) -> Optional[str]:
-    if isinstance(candidates, str):
-        return _which(candidates)
+@functools.lru_cache(maxsize=32)
+def _which_cached(candidates: tuple[str, ...], path: Optional[str]) -> Optional[str]:
     for c in candidates:
-        p = _which(c)
+        p = _which(c, path=path)
         if p:
             return p
     return None
 
 
+def which(candidates: Iterable[str] | str) -> Optional[str]:
+    """First of `candidates` found on PATH; cached per (candidates, PATH) pair."""
+    if isinstance(candidates, str):
+        candidates = (candidates,)
+    # PATH is part of the key, so editing it never serves a stale answer
+    return _which_cached(tuple(candidates), os.environ.get("PATH"))
+
+
 # ---------------- DNS helpers ----------------
 
+# Only hex digits, ':' and '.' can appear in an IPv4/IPv6 literal; anything
+# else (i.e. most hostnames) is rejected without raising from inet_pton.
+_IP_LITERAL_HINT = re.compile(r"\A[0-9A-Fa-f:.]+\Z").match
+
+
 def is_ip_literal(s: str) -> bool:
+    if not _IP_LITERAL_HINT(s):
+        return False
     try:
         socket.inet_pton(socket.AF_INET, s)
         return True
@@ -131,22 +174,90 @@ def resolve_host(target: str, dns_mode: str = "auto") -> ResolvedHost:
     return ResolvedHost(ip=ip, display=display)
 
 
+RESOLVE_TTL = 300.0  # seconds a forward resolution is reused
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_resolve(target: str, dns_mode: str, epoch: int) -> ResolvedHost:
+    return resolve_host(target, dns_mode=dns_mode)
+
+
+def resolve_host_cached(target: str, dns_mode: str = "auto") -> ResolvedHost:
+    """resolve_host(), memoized per RESOLVE_TTL-sized time bucket."""
+    return _cached_resolve(target, dns_mode, int(time.monotonic() // RESOLVE_TTL))
+
+
+# PTR lookups get their own threads so a slow resolver can't starve
+# asyncio.to_thread work (table builds, exports) on the default executor.
+_PTR_WORKERS = 16
+_ptr_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_ptr_pool() -> ThreadPoolExecutor:
+    global _ptr_pool
+    if _ptr_pool is None:
+        _ptr_pool = ThreadPoolExecutor(max_workers=_PTR_WORKERS, thread_name_prefix="ptr")
+    return _ptr_pool
+
+
 class ReverseDNSCache:
     """Very small async reverse-DNS cache to avoid blocking UI too long."""
+    ttl = 900.0  # seconds a PTR answer is trusted
+    negative_ttl = 60.0  # seconds a failed lookup is remembered
+    max_entries = 1024  # per map; least recently used entries are evicted first
+
     def __init__(self) -> None:
-        self.cache: dict[str, str] = {}  # ip -> name
+        self.cache: OrderedDict[str, tuple[str, float]] = OrderedDict()  # ip -> (name, expires_at)
+        self.negative: OrderedDict[str, float] = OrderedDict()  # ip -> expires_at
         self.pending: set[str] = set()
+        self._resolver = None  # aiodns.DNSResolver, created on first lookup inside the loop
+
+    def _remember(self, mapping: OrderedDict, ip: str, value) -> None:
+        mapping[ip] = value
+        mapping.move_to_end(ip)
+        if len(mapping) > self.max_entries:
+            mapping.popitem(last=False)
+
+    def cached(self, ip: str) -> Optional[str]:
+        """Return the cached PTR name for ip, or None if absent/expired."""
+        entry = self.cache.get(ip)
+        if entry is None:
+            return None
+        name, expires_at = entry
+        if expires_at < time.monotonic():
+            del self.cache[ip]
+            return None
+        self.cache.move_to_end(ip)
+        return name
+
+    def failed_recently(self, ip: str) -> bool:
+        """True if ip had no PTR within the last negative_ttl seconds."""
+        expires_at = self.negative.get(ip)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self.negative[ip]
+            return False
+        return True
 
-    async def lookup(self, ip: Optional[str]) -> Optional[str]:
-        if not ip or is_ip_literal(ip) is False:
-            return ip
-        if ip in self.cache:
-            return self.cache[ip]
-        if ip in self.pending:
-            return ip  # return ip until finished
+    async def _resolve_ptr(self, ip: str) -> Optional[str]:
+        """PTR name for ip via aiodns when usable, else gethostbyaddr on the ptr pool."""
+        global aiodns
+        if aiodns is not None:
+            try:
+                if self._resolver is None:
+                    self._resolver = aiodns.DNSResolver()
+            except Exception:
+                # e.g. Windows' Proactor loop, which aiodns can't run on;
+                # use the thread pool for the rest of the process
+                aiodns = None
+            else:
+                try:
+                    return (await self._resolver.gethostbyaddr(ip)).name
+                except Exception:
+                    return None
 
         loop = asyncio.get_running_loop()
-        self.pending.add(ip)
 
         def _do():
             try:
@@ -155,9 +266,55 @@ class ReverseDNSCache:
             except Exception:
                 return None
 
-        name = await loop.run_in_executor(None, _do)
-        self.pending.discard(ip)
+        return await loop.run_in_executor(_get_ptr_pool(), _do)
+
+    async def lookup(self, ip: Optional[str]) -> Optional[str]:
+        if not ip or is_ip_literal(ip) is False:
+            return ip
+        name = self.cached(ip)
+        if name is not None:
+            return name
+        if ip in self.pending or self.failed_recently(ip):
+            return ip  # return ip until finished, or while a miss is still fresh
+
+        self.pending.add(ip)
+        try:
+            name = await self._resolve_ptr(ip)
+        finally:
+            self.pending.discard(ip)
         if name:
-            self.cache[ip] = name
+            self._remember(self.cache, ip, (name, time.monotonic() + self.ttl))
             return name
+        self._remember(self.negative, ip, time.monotonic() + self.negative_ttl)
         return ip  # fallback to ip if no PTR
+
+    async def batch_reverse(self, ips: Iterable[str], limit: int = _PTR_WORKERS) -> dict[str, Optional[str]]:
+        """
+        Resolve many IPs concurrently (at most `limit` lookups in flight).
+        Returns ip -> name, falling back to the ip itself when there is no PTR.
+        """
+        result: dict[str, Optional[str]] = {}
+        uncached: list[str] = []
+        for ip in dict.fromkeys(ips):  # de-duplicate, keep order
+            if not is_ip_literal(ip):
+                result[ip] = ip  # already a name; lookup() would hand it straight back
+                continue
+            name = self.cached(ip)
+            if name is not None:
+                result[ip] = name
+            elif self.failed_recently(ip):
+                result[ip] = ip  # no PTR last time; don't spend a task on it
+            else:
+                uncached.append(ip)
+        if not uncached:
+            return result
+
+        sem = asyncio.Semaphore(limit)
+
+        async def _bounded(ip: str) -> Optional[str]:
+            async with sem:
+                return await self.lookup(ip)
+
+        names = await asyncio.gather(*(_bounded(ip) for ip in uncached))
+        result.update(zip(uncached, names))
+        return result